@@ -54,10 +54,10 @@ class ArxivLookup(XML_Lookup):
     def get_results(self, data: bytes) -> Optional[Iterable[Element]]:
         """Return the result list"""
         try:
-            xml = fromstring(data.decode())
+            xml = fromstring(data)
         except ParseError:
             return None
-        return xml.findall(self.xml_prefix + "entry")
+        return xml.iterfind(self.xml_prefix + "entry")
 
     def xml_gettext(self, elem: Element, attr: str) -> Optional[str]:
         value = elem.find(self.xml_prefix + attr)
@@ -109,9 +109,9 @@ class DOICheck(
                     text = normalize_str_weak(data, from_latex=False)
                     for elem in self.not_available_checks:
                         if elem in text:
-                            logger.debug("INVALID TEXT IN RESPONSE PAGE " + elem)
+                            logger.debug("INVALID TEXT IN RESPONSE PAGE {text}", text=elem)
                             return False
                 except UnicodeDecodeError:
-                    logger.warn("Can't decode text content from URL {}".format(url))
+                    logger.warn("Can't decode text content from URL {url}", url=url)
                 return True
         return False
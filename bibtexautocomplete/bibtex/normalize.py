@@ -3,7 +3,8 @@ Functions used to normalize bibtex fields
 """
 
 import unicodedata
-from re import search, sub
+from functools import lru_cache
+from re import compile, search, sub
 from typing import Optional, Tuple
 from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlsplit
 
@@ -43,6 +44,8 @@ def has_field(entry: EntryType, field: str) -> bool:
 
 def strip_accents(string: str) -> str:
     """replace accented characters with their non-accented variants"""
+    if string.isascii():
+        return string  # nothing to strip, skip the per-character filter
     # Solution from https://stackoverflow.com/a/518232
     return "".join(c for c in unicodedata.normalize("NFD", string) if unicodedata.category(c) != "Mn")
 
@@ -57,22 +60,19 @@ def normalize_str_weak(string: str, from_latex: bool = True) -> str:
     return sub(r"\s+", " ", string)
 
 
+# Runs of non alpha-numeric characters (\w is alpha-numeric or _)
+NON_ALPHANUMERIC = compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=4096)
 def normalize_str(string: str) -> str:
     """Normalize string for decent comparison
     Converts to lower case, strips accents
     Replaces all non alpha-numeric characters with spaces
-    Removes duplicate spaces"""
-    string = latex_to_unicode(string)
-    res = ""
-    prev_space = False
-    for x in strip_accents(string):
-        if x.isalnum():
-            res += x
-            prev_space = False
-        elif not prev_space:
-            res += " "
-            prev_space = True
-    return res.lower().strip()
+    Removes duplicate spaces
+    Memoized, since entry fields are compared to every result of every source"""
+    string = strip_accents(latex_to_unicode(string))
+    return NON_ALPHANUMERIC.sub(" ", string).lower().strip()
 
 
 DOI_REGEX = r"(10\.\d{4,5}\/[\S]+[^;,.\s])$"
@@ -96,7 +96,7 @@ def normalize_url(url: str, previous: Optional[str] = None) -> Optional[Tuple[st
         url = urljoin(previous, url)
     split = urlsplit(url)
     if split.netloc == "" or split.scheme == "":
-        logger.debug(f"INVALID URL: {url_copy}, FROM {previous}")
+        logger.debug("INVALID URL: {url}, FROM {previous}", url=url_copy, previous=previous)
         return None
     domain = split.netloc
     path = quote(split.path, safe="/:+-_.~")
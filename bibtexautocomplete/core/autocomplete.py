@@ -228,7 +228,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
         total = len(all_entries)
         filtered = self.count_entries()
         if total > filtered:
-            logger.info("Filtered down to {} entries".format(filtered))
+            logger.info("Filtered down to {filtered} entries", filtered=filtered)
         if isinstance(self.entries, OnlyExclude):
             warn_only, warn_exclude = self.entries.unused(all_entries)
             for x in sorted(warn_only):
@@ -324,8 +324,10 @@ class BibtexAutocomplete(Iterable[EntryType]):
                             thread.result += [(None, dict())] * remaining
                             thread.position = nb_entries
                             logger.warn(
-                                f"[{{FgBlue}}{thread.name}{{Reset}}] Skipping last {remaining} queries since the"
-                                " majority of the other sources have finished."
+                                "[{FgBlue}{name}{Reset}] Skipping last {remaining} queries since the"
+                                " majority of the other sources have finished.",
+                                name=thread.name,
+                                remaining=remaining,
                             )
                             SkipHint.emit()
                         else:
@@ -341,6 +343,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
                     bar()
                     self.update_entry(entries[self.position], to_complete[self.position], threads)
                     self.position += 1
+        HTTPSLookup.close_connections()
         logger.info(
             "Modified {changed_entries} / {count_entries} entries" ", added {changed_fields} fields",
             changed_entries=self.changed_entries,
@@ -233,7 +233,9 @@ def main(argv: Optional[List[str]] = None) -> int:
                     )
                     break
                 if i == completer.position:
-                    logger.info("Only completed entries up to and including '{}'.\n".format(entry.get("ID", "<no_id>")))
+                    logger.info(
+                        "Only completed entries up to and including '{entry}'.\n", entry=entry.get("ID", "<no_id>")
+                    )
                     break_next = True
             return 5
         except KeyboardInterrupt:
@@ -53,15 +53,16 @@ class LookupThread(Thread):
         while self.position < self.nb_entries:
             entry = self.entries[self.position]
             self.entry_name = entry.id
-            lookup = self.lookup(entry)
+            to_complete = self.to_complete[self.position]
             self.condition.release()
 
-            if lookup.fields.isdisjoint(self.to_complete[self.position]):
+            if self.lookup.fields.isdisjoint(to_complete):
                 # Skip query as no fields need to be completed
                 result = None
                 info = dict()
                 logger.debug("Skipping query, no data to add")
             else:
+                lookup = self.lookup(entry)
                 try:
                     result = lookup.query()
                     info = lookup.get_last_query_info()
@@ -0,0 +1,121 @@
+"""
+HTTPS connection with a process-wide DNS and TLS session cache
+
+All queries to a given source go to the same domain, so its address is
+resolved once and reused by every new connection until DNS_CACHE_TTL expires.
+Likewise, the TLS session of the last closed connection to a host is kept
+so that reconnecting resumes it instead of doing a full handshake.
+"""
+
+from collections import OrderedDict
+from http.client import HTTPConnection, HTTPSConnection
+from socket import SOCK_STREAM, AddressFamily, SocketKind, getaddrinfo, socket
+from ssl import SSLSession, SSLSocket
+from threading import Lock
+from time import monotonic
+from typing import Any, List, Optional, Tuple
+
+from ..utils.constants import DNS_CACHE_SIZE, DNS_CACHE_TTL, TLS_SESSION_CACHE_SIZE
+from ..utils.logger import logger
+
+AddrInfo = Tuple[AddressFamily, SocketKind, int, str, Any]  # getaddrinfo result
+
+# (host, port) -> (expiry time, getaddrinfo result), in LRU order
+dns_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[AddrInfo]]]" = OrderedDict()
+dns_cache_lock = Lock()
+
+# (host, port, id of the SSLContext) -> last TLS session, in LRU order
+# sessions can only be resumed with the context that created them
+tls_sessions: "OrderedDict[Tuple[str, int, int], SSLSession]" = OrderedDict()
+tls_sessions_lock = Lock()
+
+
+def resolve(host: str, port: int) -> List[AddrInfo]:
+    """Same as getaddrinfo(host, port, type=SOCK_STREAM), cached for DNS_CACHE_TTL seconds"""
+    key = (host, port)
+    with dns_cache_lock:
+        cached = dns_cache.get(key)
+        if cached is not None:
+            dns_cache.move_to_end(key)
+    if cached is not None and cached[0] > monotonic():
+        return cached[1]
+    addresses: List[AddrInfo] = list(getaddrinfo(host, port, 0, SOCK_STREAM))
+    logger.very_verbose_debug("resolved {host} to {number} addresses", host=host, number=len(addresses))
+    with dns_cache_lock:
+        dns_cache[key] = (monotonic() + DNS_CACHE_TTL, addresses)
+        dns_cache.move_to_end(key)
+        while len(dns_cache) > DNS_CACHE_SIZE:
+            dns_cache.popitem(last=False)
+    return addresses
+
+
+def create_connection(
+    address: Tuple[str, int],
+    timeout: Any = None,
+    source_address: Optional[Tuple[str, int]] = None,
+) -> socket:
+    """Same as socket.create_connection, but resolves address with the DNS cache
+    If no address can be reached, they are removed from the cache"""
+    error: Optional[OSError] = None
+    for family, kind, proto, _, sockaddr in resolve(*address):
+        sock = None
+        try:
+            sock = socket(family, kind, proto)
+            if timeout is None or isinstance(timeout, (int, float)):
+                # Anything else is http.client's "use the global default" sentinel
+                sock.settimeout(timeout)
+            if source_address is not None:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as err:
+            error = err
+            if sock is not None:
+                sock.close()
+    # Cached addresses may be stale, resolve again on the next connection
+    with dns_cache_lock:
+        dns_cache.pop(address, None)
+    if error is not None:
+        raise error
+    raise OSError("getaddrinfo returns an empty list")
+
+
+class CachedDNSConnection(HTTPSConnection):
+    """HTTPSConnection resolving its host through the DNS cache
+    TLS still uses the host name for SNI and certificate checks,
+    and resumes the last session to the same host when possible"""
+
+    _context: Any  # set by HTTPSConnection, missing from typeshed
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._create_connection = create_connection
+
+    def session_key(self) -> Tuple[str, int, int]:
+        return (self.host, self.port, id(self._context))
+
+    def connect(self) -> None:
+        """Same as HTTPSConnection.connect, but passes the cached session to wrap_socket"""
+        HTTPConnection.connect(self)
+        with tls_sessions_lock:
+            session = tls_sessions.get(self.session_key())
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=self.host, session=session)
+        if session is not None:
+            logger.very_verbose_debug(
+                "TLS session to {host} resumed: {resumed}", host=self.host, resumed=self.sock.session_reused
+            )
+
+    def close(self) -> None:
+        """Saves the TLS session before closing.
+        TLS 1.3 sends session tickets after the handshake, so they are
+        only available once some data has been exchanged"""
+        if isinstance(self.sock, SSLSocket):
+            session = self.sock.session
+            if session is not None and session.has_ticket:
+                key = self.session_key()
+                with tls_sessions_lock:
+                    tls_sessions[key] = session
+                    tls_sessions.move_to_end(key)
+                    while len(tls_sessions) > TLS_SESSION_CACHE_SIZE:
+                        tls_sessions.popitem(last=False)
+        super().close()
@@ -2,18 +2,43 @@
 Lookup for HTTPS queries
 """
 
-from http.client import HTTPResponse, HTTPSConnection
-from socket import gaierror, timeout
-from ssl import _create_unverified_context
-from time import sleep, time
-from typing import Any, ClassVar, Dict, Optional
-from urllib.parse import urlencode
+import ssl
+from collections import OrderedDict
+from gzip import decompress as gzip_decompress
+from http.client import BadStatusLine, HTTPResponse, HTTPSConnection
+from socket import EAI_AGAIN, gaierror, timeout
+from ssl import SSLCertVerificationError, SSLContext, _create_unverified_context
+from threading import Lock
+from time import monotonic, perf_counter, sleep
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+from zlib import MAX_WBITS
+from zlib import decompress as zlib_decompress
+from zlib import error as zlib_error
 
 from ..bibtex.normalize import normalize_url
-from ..utils.constants import CONNECTION_TIMEOUT, MIN_QUERY_DELAY, USER_AGENT
+from ..utils.constants import (
+    CONNECTION_POOL_SIZE,
+    CONNECTION_TIMEOUT,
+    MIN_QUERY_DELAY,
+    QUERY_CACHE_SIZE,
+    USER_AGENT,
+)
 from ..utils.logger import Hint, logger
 from ..utils.safe_json import JSONType
 from .abstract_base import AbstractDataLookup, Data, Input, Output
+from .connection import CachedDNSConnection
+
+brotli_decompress: Optional[Callable[[bytes], bytes]] = None
+try:
+    from brotli import decompress
+
+    brotli_decompress = decompress
+except ImportError:
+    pass
+
+# Compressed encodings we can decode, brotli only if the module is installed
+ACCEPT_ENCODING = "gzip, deflate" if brotli_decompress is None else "gzip, deflate, br"
 
 DNS_Fail_Hint = Hint("check your internet connection or DNS server")
 SSL_Fail_Hint = Hint(
@@ -24,6 +49,41 @@ SSL_Fail_Hint = Hint(
 TIMEOUT_Hint = Hint("you can increase timeout with -t / --timeout option.")
 
 
+def encode_params(params: Dict[str, str], safe: str = "") -> str:
+    """Same as urllib.parse.urlencode(params, safe=safe) for string values,
+    without urlencode's per-item type dispatch"""
+    return "&".join(quote_plus(key, safe) + "=" + quote_plus(value, safe) for key, value in params.items())
+
+
+def inflate(data: bytes) -> bytes:
+    """Decompress a deflate encoded body, which should be zlib wrapped
+    but some servers send raw deflate data"""
+    try:
+        return zlib_decompress(data)
+    except zlib_error:
+        return zlib_decompress(data, -MAX_WBITS)
+
+
+def decode_content(data: bytes, encoding: Optional[str]) -> bytes:
+    """Decompress a response body according to its Content-Encoding header
+    Raises ValueError if the encoding is unknown or decoding fails"""
+    if encoding is None or not data:
+        return data  # nothing to decode, e.g. empty 204 replies
+    encoding = encoding.strip().lower()
+    try:
+        if encoding == "gzip":
+            return gzip_decompress(data)
+        if encoding == "deflate":
+            return inflate(data)
+        if encoding == "br" and brotli_decompress is not None:
+            return brotli_decompress(data)
+    except Exception as err:
+        raise ValueError(f"failed to decode {encoding} response: {err}") from err
+    if encoding != "identity":
+        raise ValueError(f"unsupported content encoding '{encoding}'")
+    return data
+
+
 class HTTPSLookup(AbstractDataLookup[Input, Output]):
     """Abstract class to wrap https queries:
     Initialized with the entry to query info about
@@ -40,10 +100,14 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
     - request : str = "GET" - https request type
     - default_headers : Dict[str, str] = ... default http header
     - headers : Dict[str, str] = {} - headers to add, overrite default_headers
+      these are merged into class_headers when the class is created
 
     all of these have associated methods get_XX : Self -> Type[XX] that can be overridden
     for finer behavior control
 
+    Connections are kept alive after a query and reused by the next query
+    to the same domain, saving a TCP + TLS handshake per query.
+
     Virtual methods and attributes:
     - handle_output : Self, bytes -> Optional[Result] - parses output into useful result
     """
@@ -64,22 +128,48 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
     default_headers: Dict[str, str] = {
         "User-Agent": USER_AGENT,
         "Accept": accept,
+        "Connection": "keep-alive",
+        "Accept-Encoding": ACCEPT_ENCODING,
     }
     headers: Dict[str, str] = {}
 
+    # default_headers, accept and headers merged together.
+    # Computed once per class in __init_subclass__, only Host is added per query
+    class_headers: ClassVar[Dict[str, str]] = {**default_headers, "Accept": accept, **headers}
+
     connection_timeout: Optional[float] = CONNECTION_TIMEOUT
 
     response: Optional[HTTPResponse] = None
 
+    # Encoded path of the current query, reset at the start of each query.
+    # Attributes used to build it (e.g. self.title) only change between queries
+    path_cache: Optional[str] = None
+    # Headers of this lookup's queries, only the Host changes (on redirects)
+    headers_cache: Optional[Dict[str, str]] = None
+
     _last_query_info: Dict[str, JSONType] = {}
 
+    # Idle connections kept alive for reuse, shared by all lookups, in LRU order.
+    # A connection is removed from the pool while in use, so threads never share one
+    connection_pool: ClassVar["OrderedDict[Tuple[str, bool], HTTPSConnection]"] = OrderedDict()
+    connection_pool_lock: ClassVar[Lock] = Lock()
+    connection_pool_size: ClassVar[int] = CONNECTION_POOL_SIZE
+
+    # SSL contexts shared by all connections, indexed by ignore_ssl.
+    # Built on first use, as building one loads the system's CA certificates
+    ssl_contexts: ClassVar[Dict[bool, SSLContext]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.class_headers = {**cls.default_headers, "Accept": cls.accept, **cls.headers}
+
     def get_headers(self) -> Dict[str, str]:
-        """Return the headers used in an HTTPS request"""
-        headers = self.default_headers.copy()
-        headers["Accept"] = self.accept
-        headers.update(self.headers)
-        headers["Host"] = self.get_host()
-        return headers
+        """Return the headers used in an HTTPS request
+        Built once per instance, see headers_cache"""
+        if self.headers_cache is None:
+            self.headers_cache = self.class_headers.copy()
+            self.headers_cache["Host"] = self.get_host()
+        return self.headers_cache
 
     def get_request(self) -> str:
         """Return the request method to use
@@ -105,12 +195,13 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
 
     def get_path(self) -> str:
         """Return the path to connect to
-        override this if not using self.path"""
-        params = self.get_params()
-        path = self.get_base_path()
-        if params:
-            return path + "?" + urlencode(params, safe=self.safe)
-        return path
+        override this if not using self.path
+        The result is computed once per query, see path_cache"""
+        if self.path_cache is None:
+            params = self.get_params()
+            path = self.get_base_path()
+            self.path_cache = path + "?" + encode_params(params, self.safe) if params else path
+        return self.path_cache
 
     def get_params(self) -> Dict[str, str]:
         """Url parameters, can use self.entry to set them
@@ -121,6 +212,11 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
         """Query body, can use self.entry to set them"""
         return None
 
+    def query(self) -> Optional[Output]:
+        """Resets path_cache, as the attributes used to build the path change between queries"""
+        self.path_cache = None
+        return super().query()
+
     def get_data(self) -> Optional[Data]:
         """main lookup function
         returns true if the lookup succeeded in finding all info
@@ -137,38 +233,27 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
             url=url,
         )
         logger.very_verbose_debug("headers: {headers}", headers=headers)
-        start = time()
+        start = perf_counter()
         try:
-            if self.ignore_ssl:
-                connection = HTTPSConnection(
-                    domain,
-                    timeout=self.connection_timeout,
-                    context=_create_unverified_context(),
+            connection, self.response = self.send_request(domain, request, path, headers)
+            try:
+                delay = round(perf_counter() - start, 3)
+                self._last_query_info = {
+                    "url": url,
+                    "response-time": delay,
+                    "response-status": self.response.status,
+                }
+                logger.debug(
+                    "response {status}{reason} in {delay}s",
+                    status=self.response.status,
+                    reason=" " + self.response.reason if self.response.reason else "",
+                    delay=delay,
                 )
-            else:
-                connection = HTTPSConnection(domain, timeout=self.connection_timeout)
-            connection.request(
-                request,
-                path,
-                self.get_body(),
-                headers,
-            )
-            self.response = connection.getresponse()
-            delay = round(time() - start, 3)
-            self._last_query_info = {
-                "url": url,
-                "response-time": delay,
-                "response-status": self.response.status,
-            }
-            logger.debug(
-                "response {status}{reason} in {delay}s",
-                status=self.response.status,
-                reason=" " + self.response.reason if self.response.reason else "",
-                delay=delay,
-            )
-            logger.very_verbose_debug("response headers: {headers}", headers=self.response.headers)
-            data = self.response.read()
-            connection.close()
+                logger.very_verbose_debug("response headers: {headers}", headers=self.response.headers)
+                data = self.response.read()
+            finally:
+                # Only place the connection is released: pooled if fully read, closed otherwise
+                self.release_connection(domain, connection, self.response)
         except timeout:
             if self.silent_fail:
                 return None
@@ -181,16 +266,21 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
             error_name = "CONNECTION ERROR"
             error_msg = "{err}"
             hint = None
-            if str(err) == "[Errno -3] Temporary failure in name resolution":
-                padding = "\n" + " " * (len(error_name) + 2)
-                error_msg += "{}Could not resolve '{}'".format(padding, domain)
+            if isinstance(err, gaierror) and err.errno == EAI_AGAIN:
+                error_msg += "\n{padding}Could not resolve '{domain}'"
                 hint = DNS_Fail_Hint
-            elif "[SSL: CERTIFICATE_VERIFY_FAILED]" in str(err):
+            elif isinstance(err, SSLCertVerificationError):
                 hint = SSL_Fail_Hint
-            logger.warn(error_msg, err=err, error=error_name)
+            logger.warn(error_msg, err=err, error=error_name, padding=" " * (len(error_name) + 2), domain=domain)
             if hint is not None:
                 hint.emit()
             return None
+        try:
+            data = decode_content(data, self.response.getheader("Content-Encoding"))
+        except ValueError as err:
+            # Keep the raw data, it may still be usable
+            if not self.silent_fail:
+                logger.warn("{err}", err=err)
         return Data(
             data=data,
             code=self.response.status,
@@ -198,6 +288,83 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
             reason=self.response.reason,
         )
 
+    @classmethod
+    def get_ssl_context(cls) -> SSLContext:
+        """Return the SSL context shared by all connections,
+        it skips certificate verification if ignore_ssl is set"""
+        context = HTTPSLookup.ssl_contexts.get(cls.ignore_ssl)
+        if context is None:
+            if cls.ignore_ssl:
+                context = _create_unverified_context()
+            else:
+                # Looked up at call time, as done by HTTPSConnection, to honor
+                # overrides of ssl._create_default_https_context (PEP 476)
+                context = ssl._create_default_https_context()
+            context.set_alpn_protocols(["http/1.1"])  # as done by HTTPSConnection
+            HTTPSLookup.ssl_contexts[cls.ignore_ssl] = context
+        return context
+
+    def new_connection(self, domain: str) -> HTTPSConnection:
+        """Opens a new connection to the given domain"""
+        return CachedDNSConnection(domain, timeout=self.connection_timeout, context=self.get_ssl_context())
+
+    def send_request(
+        self, domain: str, request: str, path: str, headers: Dict[str, str]
+    ) -> Tuple[HTTPSConnection, HTTPResponse]:
+        """Sends the request and waits for the response headers,
+        reusing a kept-alive connection to domain if there is one.
+        Returns the connection used, which must be released once the response is read"""
+        key = (domain, self.ignore_ssl)
+        with self.connection_pool_lock:
+            connection = self.connection_pool.pop(key, None)
+        if connection is not None:
+            if connection.timeout == self.connection_timeout:
+                try:
+                    connection.request(request, path, self.get_body(), headers)
+                    return connection, connection.getresponse()
+                except (BadStatusLine, ConnectionError):
+                    # Server closed the idle connection, retry on a new one
+                    logger.very_verbose_debug("kept-alive connection to {domain} was closed", domain=domain)
+                except BaseException:
+                    connection.close()
+                    raise
+            connection.close()
+        connection = self.new_connection(domain)
+        try:
+            connection.request(request, path, self.get_body(), headers)
+            return connection, connection.getresponse()
+        except BaseException:
+            connection.close()
+            raise
+
+    def release_connection(self, domain: str, connection: HTTPSConnection, response: HTTPResponse) -> None:
+        """Puts a connection back into the pool once its response was fully read,
+        closes it instead if the server asked to, or if the read failed.
+        Closes the least recently used idle connections if the pool is full"""
+        if response.will_close or not response.isclosed():
+            connection.close()
+            return
+        key = (domain, self.ignore_ssl)
+        to_close: List[HTTPSConnection] = []
+        with self.connection_pool_lock:
+            previous = self.connection_pool.pop(key, None)
+            if previous is not None:
+                to_close.append(previous)
+            self.connection_pool[key] = connection
+            while len(self.connection_pool) > self.connection_pool_size:
+                to_close.append(self.connection_pool.popitem(last=False)[1])
+        for idle in to_close:
+            idle.close()
+
+    @classmethod
+    def close_connections(cls) -> None:
+        """Closes all idle kept-alive connections"""
+        with cls.connection_pool_lock:
+            connections = list(cls.connection_pool.values())
+            cls.connection_pool.clear()
+        for connection in connections:
+            connection.close()
+
     def get_last_query_info(self) -> Dict[str, JSONType]:
         base = dict()
         base.update(super().get_last_query_info())
@@ -215,7 +382,7 @@ class RedirectFollower(HTTPSLookup[Input, Output]):
 
     def get_data(self) -> Optional[Data]:
         data = super().get_data()
-        while data is not None and data.code in [301, 302, 303, 307]:
+        while data is not None and data.code in [301, 302, 303, 307, 308]:
             if self.response is None:
                 return data
             location = self.response.getheader("Location")
@@ -231,6 +398,8 @@ class RedirectFollower(HTTPSLookup[Input, Output]):
                 return data
             self.domain = split[0]
             self.path = split[1]
+            self.path_cache = None
+            self.headers_cache = None
             data = super().get_data()
         return data
 
@@ -238,7 +407,7 @@ class RedirectFollower(HTTPSLookup[Input, Output]):
 class HTTPSRateCapedLookup(HTTPSLookup[Input, Output]):
     """Add a rate cap to respect polite server requirements"""
 
-    # Time of last query
+    # Time of last query, as given by time.monotonic()
     # This is a class attribute to the given lookup
     last_query_time: float = 0
     query_delay: float = MIN_QUERY_DELAY  # time between queries, in seconds
@@ -249,14 +418,69 @@ class HTTPSRateCapedLookup(HTTPSLookup[Input, Output]):
         return None
 
     def get_data(self) -> Optional[Data]:
-        since_last_query = time() - self.last_query_time
+        since_last_query = monotonic() - self.last_query_time
         wait = self.query_delay - since_last_query
         if wait >= 0.0:
             logger.debug("Rate limiter: sleeping for {wait}s", wait=round(wait, 3))
             sleep(wait)
-        self.__class__.last_query_time = time()
+        self.__class__.last_query_time = monotonic()
         data = super().get_data()
         new_cap = self.update_rate_cap()  # update rate cap with response headers
         if new_cap is not None:
             self.__class__.query_delay = new_cap * 1.1  # round up for good measure
         return data
+
+
+class HTTPSCachedLookup(HTTPSLookup[Input, Output]):
+    """Answers identical queries from a cache of recent responses
+    Only successful (code 200) GET queries without body are cached,
+    unless the server forbids it with Cache-Control: no-store.
+
+    Inherit from this before HTTPSRateCapedLookup so that cache hits
+    do not wait for the rate limiter"""
+
+    cache_size: ClassVar[int] = QUERY_CACHE_SIZE
+
+    # Shared by all lookups, the key contains the domain
+    response_cache: ClassVar["OrderedDict[Tuple[str, str], Tuple[Data, HTTPResponse]]"] = OrderedDict()
+    response_cache_lock: ClassVar[Lock] = Lock()
+
+    def get_data(self) -> Optional[Data]:
+        if self.get_request() != "GET" or self.get_body() is not None:
+            return super().get_data()
+        key = (self.get_domain(), self.get_path())
+        with self.response_cache_lock:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self.response_cache.move_to_end(key)
+        if cached is not None:
+            cached_data, self.response = cached
+            logger.debug("GET https://{domain}{path} (cached)", domain=key[0], path=key[1])
+            self._last_query_info = {
+                "url": f"https://{key[0]}{key[1]}",
+                "response-time": 0.0,
+                "response-status": cached_data.code,
+                "cached": True,
+            }
+            return cached_data
+        data = super().get_data()
+        if data is not None and data.code == 200 and self.response is not None and self.is_cacheable(self.response):
+            with self.response_cache_lock:
+                self.response_cache[key] = (data, self.response)
+                while len(self.response_cache) > self.cache_size:
+                    self.response_cache.popitem(last=False)
+        return data
+
+    @staticmethod
+    def is_cacheable(response: HTTPResponse) -> bool:
+        """Checks the response's Cache-Control header allows storing it"""
+        cache_control = response.getheader("Cache-Control")
+        if cache_control is None:
+            return True
+        return "no-store" not in (directive.strip().lower() for directive in cache_control.split(","))
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Empties the response cache"""
+        with cls.response_cache_lock:
+            cls.response_cache.clear()
@@ -6,7 +6,7 @@ from xml.etree.ElementTree import Element
 
 from ..bibtex.entry import BibtexEntry
 from ..utils.safe_json import SafeJSON
-from .https import HTTPSRateCapedLookup
+from .https import HTTPSCachedLookup, HTTPSRateCapedLookup
 from .multiple_mixin import DAT_Query_Mixin
 from .search_mixin import EntryMatchSearchMixin
 
@@ -14,6 +14,7 @@ from .search_mixin import EntryMatchSearchMixin
 class JSON_Lookup(
     DAT_Query_Mixin,
     EntryMatchSearchMixin[SafeJSON],
+    HTTPSCachedLookup[BibtexEntry, BibtexEntry],
     HTTPSRateCapedLookup[BibtexEntry, BibtexEntry],
 ):
     pass
@@ -22,6 +23,7 @@ class JSON_Lookup(
 class XML_Lookup(
     DAT_Query_Mixin,
     EntryMatchSearchMixin[Element],
+    HTTPSCachedLookup[BibtexEntry, BibtexEntry],
     HTTPSRateCapedLookup[BibtexEntry, BibtexEntry],
 ):
     pass
@@ -57,13 +57,16 @@ class DAT_Query_Mixin(MultipleQueryMixin[BibtexEntry, BibtexEntry], AbstractEntr
     authors: Optional[List[str]] = None
 
     def iter_queries(self) -> Iterator[None]:
+        # Only read the fields used by enabled queries
         self.title = self.entry.title.to_str()
         if self.title is not None:
             self.title = normalize_str(self.title)
-        self.doi = self.entry.doi.to_str()
-        authors = self.entry.author.value
-        if authors is not None:
-            self.authors = [author.lastname for author in authors]
+        if self.query_doi:
+            self.doi = self.entry.doi.to_str()
+        if self.query_author_title:
+            authors = self.entry.author.value
+            if authors is not None:
+                self.authors = [author.lastname for author in authors]
 
         if self.query_doi and self.doi is not None:
             yield None
@@ -10,7 +10,7 @@ New virtual methods:
 
 from typing import Generic, Iterable, List, Optional, TypeVar
 
-from ..bibtex.constants import ENTRY_NO_MATCH
+from ..bibtex.constants import ENTRY_CERTAIN_MATCH, ENTRY_NO_MATCH
 from ..bibtex.entry import BibtexEntry
 from ..utils.logger import logger
 from .abstract_base import Data
@@ -53,7 +53,9 @@ class SearchResultMixin(Generic[result]):
 
     def get_results(self, data: bytes) -> Optional[Iterable[result]]:
         """Parse the data into a list of results to check
-        Return None if no results/invalid data"""
+        Return None if no results/invalid data
+        Prefer returning a lazy iterable (e.g. SafeJSON.iter_list), results are
+        iterated only once, and only as far as process_data needs"""
         raise NotImplementedError("should be overridden in child class")
 
     def get_value(self, res: result) -> BibtexEntry:
@@ -70,7 +72,8 @@ class SearchResultMixin(Generic[result]):
         raise NotImplementedError("should be overridden in child class")
 
     def process_data(self, data: Data) -> Optional[BibtexEntry]:
-        """Iterate through results until one matches"""
+        """Iterate through results until one matches
+        Returns the best match, or the first certain match"""
         if data.code not in self.ok_codes:
             if data.code not in self.get_no_warning_codes():
                 logger.warn(
@@ -90,6 +93,8 @@ class SearchResultMixin(Generic[result]):
             entry = self.get_value(res)
             score = self.match_score(entry, res)
             logger.verbose_debug("match {} for {}", score, entry)
+            if score >= ENTRY_CERTAIN_MATCH:
+                return entry
             if score > max_score:
                 max_score = score
                 max_entry = entry
@@ -2,6 +2,10 @@
 ANSI escape sequence for colors and styles
 """
 
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, List
+
 
 class ANSICodes:
     use_ansi: bool = True
@@ -75,16 +79,46 @@ class ANSICodes:
     def ansi_format(cls, string: str, *args: object, **kwargs: object) -> str:
         """Return the string formatted with args and kwargs,
         adding the color formatters"""
-        codes = cls.Codes
-        if not cls.use_ansi:
-            codes = cls.EmptyCodes
-        return string.format(*args, **kwargs, **codes)
+        if not args and not kwargs and "{" not in string and "}" not in string:
+            return string  # nothing to format
+        template = compile_codes(string, cls.use_ansi)
+        if args:
+            return template.format(*args, **kwargs)
+        return template.format_map(kwargs)
 
     @classmethod
     def ansiless_len(cls, string: str) -> int:
         """Length of a string without counting ANSI sequences"""
-        codes = cls.EmptyCodes
-        return len(string.format(**codes))
+        if "{" not in string and "}" not in string:
+            return len(string)  # nothing to format
+        return len(string.format_map(cls.EmptyCodes))
+
+
+# str.format's !s, !r and !a conversions
+CONVERSIONS: Dict[str, Callable[[object], str]] = {"s": str, "r": repr, "a": ascii}
+
+
+@lru_cache(maxsize=512)
+def compile_codes(string: str, use_ansi: bool) -> str:
+    """Replace the color formatters in string by their value (or nothing if
+    use_ansi is false). Other fields are left untouched for str.format.
+    Memoized, as log messages are mostly the same few constant strings"""
+    codes = ANSICodes.Codes if use_ansi else ANSICodes.EmptyCodes
+    parts: List[str] = []
+    for literal, field, spec, conversion in Formatter().parse(string):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field in codes:
+            code: object = codes[field]
+            if conversion is not None:
+                code = CONVERSIONS[conversion](code)
+            parts.append(format(code, spec or "").replace("{", "{{").replace("}", "}}"))
+            continue
+        conversion = "" if conversion is None else "!" + conversion
+        spec = "" if not spec else ":" + spec
+        parts.append("{" + field + conversion + spec + "}")
+    return "".join(parts)
 
 
 ansi_format = ANSICodes.ansi_format
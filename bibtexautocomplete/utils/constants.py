@@ -27,6 +27,12 @@ EMAIL = "dorian.lesbre" + chr(64) + "gmail.com"
 # Minimum delay between queries to same host, to avoid surcharging server
 MIN_QUERY_DELAY = 0.02  # s, so 50 per second
 CONNECTION_TIMEOUT = 20.0  # seconds
+DNS_CACHE_TTL = 300.0  # seconds, how long resolved domain addresses are reused
+DNS_CACHE_SIZE = 128  # max number of resolved domains kept, least recently used are dropped
+TLS_SESSION_CACHE_SIZE = 128  # max number of TLS sessions kept for resumption, least recently used are dropped
+# Max number of idle kept-alive connections, least recently used ones are closed first.
+# DOI and URL checks follow redirects to many different domains
+CONNECTION_POOL_SIZE = 32
 
 # Skip last queries to sources if the lag behind while 2/3 of the others have
 # finished. This defines the "lag behind" criteria:
@@ -55,6 +61,10 @@ BTAC_FILENAME = "{name}.btac{suffix}"
 # This allows for smaller data transfers
 QUERY_MAX_RESULTS = 10
 
+# Number of responses kept in memory to answer identical queries
+# (same domain, path and parameters) without contacting the server again
+QUERY_CACHE_SIZE = 128
+
 # Prefix added to fields with -p / --prefix option
 FIELD_PREFIX = "BTAC"
 
@@ -1,3 +1,4 @@
+from re import DOTALL, compile
 from typing import Callable, Iterable, List, Optional, Set, Tuple, TypeVar
 
 T = TypeVar("T")
@@ -8,11 +9,13 @@ def list_unduplicate(lst: List[T]) -> Tuple[List[T], Set[T]]:
     """Unduplicates a list, preserving order
     Returns of set of duplicated elements"""
     unique = list()
+    seen = set()  # same elements as unique, for fast membership tests
     dups = set()
     for x in lst:
-        if x in unique:
+        if x in seen:
             dups.add(x)
         else:
+            seen.add(x)
             unique.append(x)
     return unique, dups
 
@@ -23,12 +26,13 @@ def list_sort_using(to_sort: Iterable[Q], reference: List[T], map: Callable[[Q],
     return sorted(to_sort, key=lambda t: order[map(t)])
 
 
+# Year between 1000 and 3000, optionally followed by any separator and a month
+ISO_DATE = compile(r"([12][0-9]{3}|3000)(?:.(0[1-9]|1[0-2]))?", DOTALL)
+
+
 def split_iso_date(date: str) -> Tuple[Optional[str], Optional[str]]:
     """Extract year and month from a YYYY-MM-DD or YYYY-MM date string"""
-    year = None
-    month = None
-    if len(date) >= 4 and date[:4].isnumeric() and 1000 <= int(date[:4]) <= 3000:
-        year = date[:4]
-        if len(date) >= 7 and date[5:7].isnumeric() and 1 <= int(date[5:7]) <= 12:
-            month = date[5:7]
-    return year, month
+    match = ISO_DATE.match(date)
+    if match is None:
+        return None, None
+    return match.group(1), match.group(2)
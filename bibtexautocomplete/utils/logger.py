@@ -35,10 +35,14 @@ logging.addLevelName(VERY_VERBOSE_DEBUG, "VERY_VERBOSE_DEBUG")
 
 DEFAULT_LEVEL = logging.INFO
 
+MAIN_THREAD = main_thread()  # messages from other threads are prefixed with their name
+
 
 def prefix_indent(prefix: str, message: str) -> str:
     """Adds a prefix to the first line of message
     Indents all subsequent lines with spaces to be aligned to prefix"""
+    if "\n" not in message:
+        return ansi_format(prefix) + message
     len = ansiless_len(prefix)
     return ansi_format(prefix) + message.replace("\n", "\n" + " " * len)
 
@@ -51,7 +55,7 @@ class Logger:
         self.logger = logging.getLogger(logger_name)
         # Errors got to STDERR
         self.error_handler = logging.StreamHandler(stderr)
-        self.error_handler.addFilter(LevelFilter(logging.WARN, logging.CRITICAL))
+        self.error_handler.setLevel(logging.WARN)  # checked before filters, no Python call
         self.error_handler.setFormatter(logging.Formatter("%(message)s"))
         self.logger.addHandler(self.error_handler)
         # Everything else goes to STDOUT
@@ -66,9 +70,9 @@ class Logger:
     def add_thread_info(message: str) -> str:
         """Add thread name to message if not in main thread"""
         current = current_thread()
-        if current is not main_thread():
+        if current is not MAIN_THREAD:
             info = "[{FgBlue}" + current.name + "{Reset}] "
-            entry_name = current.entry_name if hasattr(current, "entry_name") else None
+            entry_name = getattr(current, "entry_name", None)
             if isinstance(entry_name, str):
                 info += "{StUnderline}" + entry_name + ":{Reset} "
             message = prefix_indent(info, message)
@@ -76,7 +80,10 @@ class Logger:
 
     def to_logger(self, level: int, message: str, *args: object, **kwargs: object) -> None:
         """Formats a message (with given args and ansi colors)
-        and sends it to the logger with the given level"""
+        and sends it to the logger with the given level
+        Does nothing (no formatting) if the level is disabled"""
+        if not self.logger.isEnabledFor(level):
+            return
         message = self.add_thread_info(ansi_format(message, *args, **kwargs))
         self.logger.log(level=level, msg=message)
 
@@ -175,13 +182,15 @@ class Logger:
         self.to_logger(level, title)
 
     def traceback(self, message: str, _err: Exception) -> None:
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return  # skip formatting the traceback
         prefix = ansi_format("{FgRed} | {Reset}")
-        message = message.replace("\n", "\n" + prefix)
-        m = message.split("\n")
         # Hack to ensure second line is erased
-        if len(m):
-            m[0] = m[0].ljust(80)
-            message = "\n".join(m)
+        if "\n" in message:
+            first, rest = message.split("\n", 1)
+            message = first.ljust(80) + "\n" + prefix + rest.replace("\n", "\n" + prefix)
+        else:
+            message = message.ljust(80)
         self.error(
             "\n"
             + prefix
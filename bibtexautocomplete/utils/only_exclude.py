@@ -3,7 +3,7 @@ A class designed to represent a container defined by either
 a list of contained elements or a list of excluded elements
 """
 
-from typing import Callable, Container, Iterable, List, Optional, Set, Tuple, TypeVar
+from typing import Callable, Container, FrozenSet, Iterable, List, Optional, Set, Tuple, TypeVar
 
 U = TypeVar("U", covariant=True)
 
@@ -19,9 +19,15 @@ class OnlyExclude(Container[T]):
     Implement the in operator
     and a filter iterator"""
 
+    __slots__ = ("onlys", "nots", "default", "onlys_set", "nots_set")
+
     onlys: Optional[List[T]]
     nots: Optional[List[T]]
-    default: bool = True
+    default: bool  # membership when neither onlys nor nots is set, True by default
+
+    # Same elements as onlys and nots, for fast membership tests
+    onlys_set: Optional[FrozenSet[T]]
+    nots_set: Optional[FrozenSet[T]]
 
     def __init__(self, onlys: Optional[List[T]], nots: Optional[List[T]]) -> None:
         """Create a new instance with onlys or nots.
@@ -31,6 +37,9 @@ class OnlyExclude(Container[T]):
 
         self.onlys = onlys
         self.nots = nots
+        self.default = True
+        self.onlys_set = None if onlys is None else frozenset(onlys)
+        self.nots_set = None if nots is None else frozenset(nots)
 
     @classmethod
     def from_nonempty(cls, onlys: List[T], nots: List[T]) -> "OnlyExclude[T]":
@@ -42,32 +51,32 @@ class OnlyExclude(Container[T]):
     def __contains__(self, obj: T) -> bool:  # type: ignore[override]
         """Check if obj is valid given the exclusion rules
         returns self.default if neither onlys nor nots is set"""
-        if self.onlys is not None:
-            return obj in self.onlys
-        if self.nots is not None:
-            return obj not in self.nots
+        if self.onlys_set is not None:
+            return obj in self.onlys_set
+        if self.nots_set is not None:
+            return obj not in self.nots_set
         return self.default
 
     def filter(self, iterable: Iterable[Q], map: Callable[[Q], T]) -> Iterable[Q]:
         """Returns a filtered Iterator
         Note that this filter is consumed after the first use"""
-        return filter(lambda x: map(x) in self, iterable)
+        onlys = self.onlys_set
+        if onlys is not None:
+            return (x for x in iterable if map(x) in onlys)
+        nots = self.nots_set
+        if nots is not None:
+            return (x for x in iterable if map(x) not in nots)
+        if self.default:
+            return (x for x in iterable)
+        return iter(())
 
     def unused(self, iterable: Iterable[T]) -> Tuple[Set[T], Set[T]]:
         """Return set of unused filters:
         - set of unused only filters
         - set of unused not filters"""
-        if self.onlys is not None:
-            unused = set(self.onlys)
-            for x in iterable:
-                if x in self.onlys:
-                    unused.discard(x)
-            nots = set() if self.nots is None else set(self.nots)
-            return unused, nots
-        if self.nots is not None:
-            unused = set(self.nots)
-            for x in iterable:
-                if x in self.nots:
-                    unused.discard(x)
-            return set(), unused
+        if self.onlys_set is not None:
+            nots = set() if self.nots_set is None else set(self.nots_set)
+            return set(self.onlys_set.difference(iterable)), nots
+        if self.nots_set is not None:
+            return set(), set(self.nots_set.difference(iterable))
         return set(), set()
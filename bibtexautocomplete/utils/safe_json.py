@@ -4,7 +4,8 @@ No operations will raise any error, invalid operations will simply return None
 """
 
 from json import JSONDecodeError, JSONDecoder
-from typing import Dict, Iterator, List, Optional, Tuple, Union
+from json import loads as json_loads
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from .logger import logger
 
@@ -14,6 +15,18 @@ JSONType = Union[Dict[str, "JSONType"], List["JSONType"], int, float, str, bool,
 log = logger.forget
 log_verbose = logger.forget
 
+# Decoders are stateless, a single one is shared by all calls
+json_decode = JSONDecoder().decode
+
+# Optional faster parser, used if installed
+orjson_loads: Optional[Callable[[Union[bytes, str]], Any]] = None
+try:
+    from orjson import loads
+
+    orjson_loads = loads
+except ImportError:
+    pass
+
 
 class SafeJSON:
     """class designed to make failess accesses to a JSON-like structure
@@ -22,6 +35,8 @@ class SafeJSON:
     defines get_item to seamlessly access dict entries (if item is str) or list element (if item is int)
     """
 
+    __slots__ = ("value",)  # one wrapper is created per node accessed
+
     value: JSONType
 
     def __init__(self, value: JSONType) -> None:
@@ -44,17 +59,34 @@ class SafeJSON:
 
     @staticmethod
     def from_str(json: str) -> "SafeJSON":
-        """Parses a json string into SafeJSON, returns SafeJSON(None) if invalid string"""
+        """Parses a json string into SafeJSON, returns SafeJSON(None) if invalid string
+        Uses orjson if it is installed"""
+        if orjson_loads is not None:
+            try:
+                return SafeJSON(orjson_loads(json))
+            except ValueError:
+                pass  # orjson is stricter than json (NaN, huge ints...), fall back to it
         try:
-            decoded = JSONDecoder().decode(json)
+            decoded = json_decode(json)
         except JSONDecodeError:
             return SafeJSON(None)  # empty
         return SafeJSON(decoded)
 
     @staticmethod
     def from_bytes(json: bytes) -> "SafeJSON":
-        """Parses a json bytes string into SafeJSON, returns SafeJSON(None) if invalid string"""
-        return SafeJSON.from_str(json.decode())
+        """Parses a json bytes string into SafeJSON, returns SafeJSON(None) if invalid string
+        Uses orjson if it is installed"""
+        if orjson_loads is not None:
+            try:
+                return SafeJSON(orjson_loads(json))
+            except ValueError:
+                pass  # orjson is stricter than json (NaN, huge ints...), fall back to it
+        try:
+            # json.loads detects the encoding (UTF-8, 16 or 32) from the bytes
+            decoded = json_loads(json)
+        except (JSONDecodeError, UnicodeDecodeError):
+            return SafeJSON(None)
+        return SafeJSON(decoded)
 
     def dict_contains(self, key: str) -> bool:
         """Returns true if self is a dict and has the given key"""
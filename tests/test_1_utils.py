@@ -4,6 +4,7 @@ from typing import List, Optional, Set, Tuple
 
 import pytest
 
+from bibtexautocomplete.utils.ansi import ANSICodes, ansi_format
 from bibtexautocomplete.utils.functions import (
     list_sort_using,
     list_unduplicate,
@@ -60,6 +61,22 @@ def test_OnlyExclude_exclude(test: List[int], glob: List[int]) -> None:
     assert list(a.filter(glob, lambda x: x)) == res
 
 
+def test_ansi_format() -> None:
+    message = "{FgRed}{error}:{Reset} {} in {delay:.1f}s {{literal}} {name!r}"
+    expected = "\x1b[31mERROR:\x1b[0m 404 in 0.5s {literal} 'x'"
+    use_ansi = ANSICodes.use_ansi
+    try:
+        ANSICodes.use_ansi = True
+        assert ansi_format(message, 404, error="ERROR", delay=0.52, name="x") == expected
+        spec_message = "{Reset!r:>12}|{FgRed:>6}|{x}"
+        assert ansi_format(spec_message, x=1) == spec_message.format(x=1, **ANSICodes.Codes)
+        ANSICodes.use_ansi = False
+        assert ansi_format("{FgRed}{error}:{Reset}", error="ERROR") == "ERROR:"
+        assert ansi_format("{FgRed:>3}{Reset!s}") == "   "
+    finally:
+        ANSICodes.use_ansi = use_ansi
+
+
 def test_SafeJSON() -> None:
     a = SafeJSON({"a": 5, "b": "bonjour", "c": [1, 2, {"3": 5, "4": [True, False]}]})
     assert a[0].value is None
@@ -74,6 +91,19 @@ def test_SafeJSON() -> None:
                 assert (i == 0) == x.to_bool()
 
 
+def test_SafeJSON_parse() -> None:
+    assert SafeJSON.from_bytes(b'{"a": [1, "\xc3\xa9"]}').value == {"a": [1, "\u00e9"]}
+    # Accepted by json but not orjson
+    assert SafeJSON.from_bytes(b'{"a": NaN}')["a"].to_float() is not None
+    assert SafeJSON.from_bytes(b'{"a": ').value is None
+    assert SafeJSON.from_bytes(b"").value is None
+    assert SafeJSON.from_bytes(b'{"a": "\xff"}').value is None
+    assert SafeJSON.from_bytes('{"a": 1}'.encode("utf-16")).value == {"a": 1}
+    assert SafeJSON.from_str('{"a": [1, "\u00e9"]}').value == {"a": [1, "\u00e9"]}
+    assert SafeJSON.from_str('{"a": NaN}')["a"].to_float() is not None
+    assert SafeJSON.from_str('{"a": ').value is None
+
+
 test_undup = [
     ([], ([], set())),
     ([1, 7, 6], ([1, 7, 6], set())),
@@ -102,6 +132,9 @@ test_split = [
     ("2020-01-15", ("2020", "01")),
     ("0057-01-15", (None, None)),
     ("2020-33", ("2020", None)),
+    ("3000/12", ("3000", "12")),
+    ("3001-12", (None, None)),
+    ("2020-1", ("2020", None)),
 ]
 
 
@@ -1,9 +1,28 @@
-from typing import Dict, List, NamedTuple, Optional
+from gzip import compress
+from http.client import HTTPResponse, HTTPSConnection
+from socket import timeout
+from time import monotonic
+from typing import Dict, Iterator, List, NamedTuple, Optional, cast
+from urllib.parse import urlencode
+from zlib import MAX_WBITS, compressobj
+from zlib import compress as zlib_compress
 
+import pytest
+
+from bibtexautocomplete.bibtex.constants import ENTRY_CERTAIN_MATCH
 from bibtexautocomplete.bibtex.entry import BibtexEntry
 from bibtexautocomplete.bibtex.normalize import normalize_str
-from bibtexautocomplete.lookups.abstract_base import AbstractLookup
+from bibtexautocomplete.lookups.abstract_base import AbstractLookup, Data
+from bibtexautocomplete.lookups.connection import create_connection, dns_cache, resolve
+from bibtexautocomplete.lookups.https import (
+    HTTPSCachedLookup,
+    HTTPSLookup,
+    decode_content,
+    encode_params,
+)
 from bibtexautocomplete.lookups.multiple_mixin import DAT_Query_Mixin
+from bibtexautocomplete.lookups.search_mixin import SearchResultMixin
+from bibtexautocomplete.utils.constants import DNS_CACHE_SIZE
 
 
 class ToCheck(NamedTuple):
@@ -162,3 +181,171 @@ class ConditionEval(AbstractLookup[BibtexEntry, BibtexEntry]):
     def query(self) -> Optional[BibtexEntry]:
         self.queried = True
         return None
+
+
+class ScoreSearch(SearchResultMixin[int]):
+    """Results are their own match score"""
+
+    def get_results(self, data: bytes) -> Iterator[int]:
+        for score in data:
+            assert score != 255, "results read past a certain match"
+            yield ENTRY_CERTAIN_MATCH if score == 100 else score
+
+    def get_value(self, res: int) -> BibtexEntry:
+        return BibtexEntry("test", str(res))
+
+    def match_score(self, entry: BibtexEntry, res: int) -> int:
+        return res
+
+
+def test_search_early_exit() -> None:
+    search = ScoreSearch()
+    best = search.process_data(Data(data=bytes([3, 7, 5]), code=200, reason="OK", delay=0))
+    assert best is not None and best.id == "7"
+    best = search.process_data(Data(data=bytes([3, 100, 255]), code=200, reason="OK", delay=0))
+    assert best is not None and best.id == str(ENTRY_CERTAIN_MATCH)
+    assert search.process_data(Data(data=bytes([0, 0]), code=200, reason="OK", delay=0)) is None
+
+
+def test_encode_params() -> None:
+    tests: List[Dict[str, str]] = [
+        {},
+        {"q": "A title: with spaces & symbols/+"},
+        {"search_query": "ti:foo AND au:bar", "max_results": "10"},
+        {"é": "ünicode ç", "a=b": "c?d#e"},
+    ]
+    for params in tests:
+        for safe in ("", ":"):
+            assert encode_params(params, safe) == urlencode(params, safe=safe)
+
+
+class FakeResponse:
+    def __init__(self, cache_control: Optional[str]) -> None:
+        self.cache_control = cache_control
+
+    def getheader(self, name: str) -> Optional[str]:
+        return self.cache_control if name == "Cache-Control" else None
+
+
+class CountingLookup(HTTPSLookup[BibtexEntry, BibtexEntry]):
+    queries: int = 0
+
+    def get_data(self) -> Optional[Data]:
+        self.__class__.queries += 1
+        cache_control = "private, No-Store" if self.path == "/nostore" else "max-age=60"
+        self.response = cast(HTTPResponse, FakeResponse(cache_control))
+        return Data(data=self.path.encode(), code=404 if self.path == "/404" else 200, reason="", delay=0.0)
+
+
+def test_response_cache() -> None:
+    class Cached(HTTPSCachedLookup[BibtexEntry, BibtexEntry], CountingLookup):
+        cache_size = 2
+
+    Cached.clear_cache()
+    for path, queries in [
+        ("/a", 1),
+        ("/a", 1),
+        ("/404", 2),
+        ("/404", 3),
+        ("/nostore", 4),
+        ("/nostore", 5),
+        ("/b", 6),
+        ("/a", 6),
+        ("/c", 7),
+        ("/b", 8),
+    ]:
+        lookup = Cached(BibtexEntry("test", "test"))
+        lookup.path = path
+        data = lookup.get_data()
+        assert data is not None and data.data == path.encode()
+        assert Cached.queries == queries
+    Cached.clear_cache()
+
+
+class FakeConnection:
+    closed: bool = False
+
+    def __init__(self, timeout: Optional[float]) -> None:
+        self.timeout = timeout
+
+    def request(self, *args: object) -> None:
+        raise timeout("timed out")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_pooled_connection_error() -> None:
+    lookup = HTTPSLookup[BibtexEntry, BibtexEntry](BibtexEntry("test", "test"))
+    lookup.domain = "pooled.example"
+    key = (lookup.domain, lookup.ignore_ssl)
+    connection = FakeConnection(lookup.connection_timeout)
+    HTTPSLookup.connection_pool[key] = cast(HTTPSConnection, connection)
+    with pytest.raises(timeout):
+        lookup.send_request(lookup.domain, "GET", "/", {})
+    assert connection.closed
+    assert key not in HTTPSLookup.connection_pool
+
+
+class ReadResponse:
+    will_close = False
+
+    def isclosed(self) -> bool:
+        return True
+
+
+def test_connection_pool_size() -> None:
+    HTTPSLookup.close_connections()
+    lookup = HTTPSLookup[BibtexEntry, BibtexEntry](BibtexEntry("test", "test"))
+    response = cast(HTTPResponse, ReadResponse())
+    size = HTTPSLookup.connection_pool_size
+    connections = [FakeConnection(None) for _ in range(size + 2)]
+    for i, connection in enumerate(connections):
+        lookup.release_connection(f"{i}.example", cast(HTTPSConnection, connection), response)
+    # Reusing a domain moves it last
+    lookup.release_connection("2.example", cast(HTTPSConnection, FakeConnection(None)), response)
+    assert len(HTTPSLookup.connection_pool) == size
+    assert [c.closed for c in connections[:3]] == [True, True, True]
+    assert not any(c.closed for c in connections[3:])
+    assert next(iter(HTTPSLookup.connection_pool)) == ("3.example", lookup.ignore_ssl)
+    HTTPSLookup.close_connections()
+    assert all(c.closed for c in connections)
+
+
+def test_dns_cache() -> None:
+    dns_cache.clear()
+    addresses = resolve("localhost", 443)
+    assert addresses
+    assert resolve("localhost", 443) is addresses
+    dns_cache[("localhost", 443)] = (0.0, [])
+    assert resolve("localhost", 443) == addresses
+    # Unreachable cached addresses are forgotten
+    dns_cache[("localhost", 443)] = (monotonic() + 60, [])
+    with pytest.raises(OSError):
+        create_connection(("localhost", 443), 1.0)
+    assert ("localhost", 443) not in dns_cache
+    # Least recently used domains are dropped
+    for i in range(DNS_CACHE_SIZE):
+        dns_cache[(f"{i}.example", 443)] = (monotonic() + 60, [])
+    resolve("0.example", 443)
+    resolve("localhost", 443)
+    assert len(dns_cache) == DNS_CACHE_SIZE
+    assert ("1.example", 443) not in dns_cache
+    assert ("0.example", 443) in dns_cache
+    dns_cache.clear()
+
+
+def test_decode_content() -> None:
+    data = b'{"message": "hello"}'
+    assert decode_content(data, None) == data
+    assert decode_content(data, "identity") == data
+    assert decode_content(compress(data), "gzip") == data
+    assert decode_content(compress(data), " GZIP ") == data
+    assert decode_content(zlib_compress(data), "deflate") == data
+    raw = compressobj(wbits=-MAX_WBITS)
+    assert decode_content(raw.compress(data) + raw.flush(), "deflate") == data
+    with pytest.raises(ValueError):
+        decode_content(data, "gzip")
+    with pytest.raises(ValueError):
+        decode_content(data, "unknown")
+    assert decode_content(b"", "deflate") == b""